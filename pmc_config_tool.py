@@ -1,47 +1,113 @@
 #!/usr/bin/env python3
-import xml.etree.ElementTree as ET
-from typing import Dict, List, Optional, Union
+try:
+    # lxml is optional but parses and searches large PMC files much faster
+    from lxml import etree as ET
+    _HAS_LXML = True
+except ImportError:
+    import xml.etree.ElementTree as ET
+    _HAS_LXML = False
+from typing import Callable, Dict, List, Optional, Tuple, Union
 import os
 import io
+import shutil
 import sys
 
+# Threshold parameters that need automatic Real/Raw conversion
+_THRESHOLD_PARAMS = frozenset({
+    'NOMINAL_READING', 'NOMINAL_MAX', 'NOMINAL_MIN',
+    'SEN_MAX', 'SEN_MIN',
+    'UPPER_NON_RECOVERABLE', 'UPPER_CRITICAL', 'UPPER_NON_CRITICAL',
+    'LOWER_NON_RECOVERABLE', 'LOWER_CRITICAL', 'LOWER_NON_CRITICAL'
+})
+
+# Order used by --set-thres: lower thresholds first, then upper thresholds, then nominal
+_ORDERED_PARAMS = (
+    'LOWER_NON_RECOVERABLE',
+    'LOWER_CRITICAL',
+    'LOWER_NON_CRITICAL',
+    'UPPER_NON_CRITICAL',
+    'UPPER_CRITICAL',
+    'UPPER_NON_RECOVERABLE',
+    'SEN_MIN',
+    'SEN_MAX',
+    'NOMINAL_MIN',
+    'NOMINAL_MAX'
+)
+
+_MASK_PARAMS = ('LWR_T_MASK', 'UPR_T_MASK', 'S_R_T_MASK')
+_MASK_DESCRIPTIONS = {
+    'LWR_T_MASK': 'Lower Threshold Reading Mask',
+    'UPR_T_MASK': 'Upper Threshold Reading Mask',
+    'S_R_T_MASK': 'Settable/Readable Threshold Mask'
+}
+
+
+def _parse_int(value_str: str) -> int:
+    """Parse a decimal or 0x-prefixed hex string as an integer"""
+    try:
+        return int(value_str, 0)
+    except ValueError:
+        # Base 0 rejects decimals with leading zeros such as "08"
+        return int(value_str, 10)
+
+
+def _parse_float(value_str: str) -> float:
+    """Parse a decimal, floating point or 0x-prefixed hex string as a float"""
+    return float(int(value_str, 16)) if value_str[:2] in ('0x', '0X') else float(value_str)
+
+
+# Raw values are written back in 0x-prefixed lowercase hex
+_to_hex = "0x{:x}".format
+
+
+# 10^-9 .. 10^9, covering every 4-bit R_EXP value
+_POW10 = tuple(10.0 ** i for i in range(-9, 10))
+
+
+def _pow10(exp: int) -> float:
+    """Return 10^exp as a float, using the lookup table for common exponents"""
+    return _POW10[exp + 9] if -9 <= exp <= 9 else 10.0 ** exp
+
 
 class PMCDeviceConfig:
-    def __init__(self, pmc_file: str):
+    def __init__(self, pmc_file: str, read_only: bool = False, keep_device: Optional[str] = None):
         """
         Initialize PMC device configuration parser
 
         Args:
             pmc_file: Path to the PMC file
+            read_only: Stream the file and only index devices instead of keeping
+                the full tree in memory (saving is not possible)
+            keep_device: In read_only mode, the only device whose contents are kept
         """
         self.pmc_file = pmc_file
+        self.read_only = read_only
+        self.keep_device = keep_device
         self.tree = None
         self.root = None
         self.xml_header_lines: List[str] = []
+        self._device_summaries: Optional[List[Dict[str, str]]] = None
+        self._by_name: Dict[str, ET.Element] = {}
+        self._mval_rexp_cache: Dict[str, Tuple[Optional[str], Optional[str]]] = {}
+        self._parsed_scale: Dict[str, Tuple[int, int, float, float]] = {}
+        # Device name -> {'DEV': {variable: <value>}, 'SDR': {variable: <value>}}
+        self._cfg_index: Dict[str, Dict[str, Dict[str, ET.Element]]] = {}
         self.load_file()
 
     def load_file(self):
         """Load and parse the PMC XML file"""
+        self._mval_rexp_cache = {}
+        self._parsed_scale = {}
+        self._cfg_index = {}
         try:
-            self.tree = ET.parse(self.pmc_file)
-            self.root = self.tree.getroot()
-
-            # To preserve header and processing instructions, we need to read the file manually.
-            self.xml_header_lines = []
-            lines_for_parser = []
-            in_header = True
-            with open(self.pmc_file, 'r', encoding='ISO-8859-1') as f:
-                for line in f:
-                    stripped_line = line.strip()
-                    if in_header and (stripped_line.startswith('<?') or stripped_line == ''):
-                        self.xml_header_lines.append(line)
-                    else:
-                        in_header = False
-                        lines_for_parser.append(line)
-            
-            xml_content = "".join(lines_for_parser)
+            xml_content = self._read_xml_content()
+            if self.read_only:
+                self._streaming_load_index(xml_content)
+                return
+
             self.root = ET.fromstring(xml_content)
             self.tree = ET.ElementTree(self.root)
+            self._build_name_index()
         except FileNotFoundError:
             print(f"Error: File '{self.pmc_file}' not found")
             sys.exit(1)
@@ -49,6 +115,78 @@ class PMCDeviceConfig:
             print(f"Error: Failed to parse XML file: {e}")
             sys.exit(1)
 
+    def _read_xml_content(self) -> str:
+        """
+        Read the PMC file, splitting off the header lines
+
+        Returns:
+            XML content without the header, decoded as ISO-8859-1
+        """
+        # To preserve header and processing instructions, we need to read the file manually.
+        self.xml_header_lines = []
+        lines_for_parser = []
+        in_header = True
+        with open(self.pmc_file, 'r', encoding='ISO-8859-1') as f:
+            for line in f:
+                stripped_line = line.strip()
+                if in_header and (stripped_line.startswith('<?') or stripped_line == ''):
+                    self.xml_header_lines.append(line)
+                else:
+                    in_header = False
+                    lines_for_parser.append(line)
+
+        return "".join(lines_for_parser)
+
+    def _streaming_load_index(self, xml_content: str):
+        """
+        Incrementally parse the PMC content, keeping only device summaries
+
+        Every device is cleared once it has been summarized, except keep_device
+        which stays available for lookups.
+
+        Args:
+            xml_content: XML content as returned by _read_xml_content
+        """
+        self._device_summaries = []
+        self._by_name = {}
+        # Same decoded text as the full parse, so device names match across commands
+        source = io.BytesIO(xml_content.encode('utf-8'))
+        if _HAS_LXML:
+            # Let libxml2 filter the events so only device ends reach Python
+            context = ET.iterparse(source, events=('end',), tag='device')
+        else:
+            context = ET.iterparse(source, events=('end',))
+        for _, elem in context:
+            if elem.tag != 'device':
+                continue
+
+            dev_info = self._device_summary(elem)
+            self._device_summaries.append(dev_info)
+            name = dev_info['name']
+            if self.keep_device is not None and name == self.keep_device and name not in self._by_name:
+                self._by_name[name] = elem
+            else:
+                elem.clear()
+        self.root = context.root
+
+    def _iter_devices(self):
+        """Iterate over all <device> elements, at any depth, without an XPath search"""
+        return self.root.iter('device')
+
+    def _build_name_index(self):
+        """
+        Build the device name -> Element lookup table
+
+        Device names are never edited by this tool, so the index stays valid
+        until the file is reloaded.
+        """
+        self._by_name = {}
+        for device in self._iter_devices():
+            name_elem = device.find('name')
+            # Keep the first match, like the old linear scan did
+            if name_elem is not None and name_elem.text not in self._by_name:
+                self._by_name[name_elem.text] = device
+
     def get_device_by_name(self, name: str) -> Optional[ET.Element]:
         """
         Find device by name (using <name> tag)
@@ -59,11 +197,68 @@ class PMCDeviceConfig:
         Returns:
             Device Element if found, None otherwise
         """
-        for device in self.root.findall('.//device'):
-            name_elem = device.find('name')
-            if name_elem is not None and name_elem.text == name:
-                return device
-        return None
+        return self._by_name.get(name)
+
+    def _iter_config_pairs(self, parent: ET.Element):
+        """
+        Yield the (<variable>, <value>) element pairs of each <config> under parent
+
+        Args:
+            parent: Device or SDR element
+        """
+        # Both ElementTree and lxml cache the parsed 'config' path, so there is
+        # nothing to gain from a precompiled XPath object here
+        for config_elem in parent.iterfind('config'):
+            # Normal layout is <variable> then <value>, which needs no child search
+            if len(config_elem) >= 2 and config_elem[0].tag == 'variable' and config_elem[1].tag == 'value':
+                yield config_elem[0], config_elem[1]
+                continue
+
+            var_elem = config_elem.find('variable')
+            val_elem = config_elem.find('value')
+            if var_elem is not None and val_elem is not None:
+                yield var_elem, val_elem
+
+    def _index_configs(self, parent: ET.Element) -> Dict[str, ET.Element]:
+        """
+        Map each <config> variable under parent to its <value> element
+
+        Args:
+            parent: Device or SDR element
+
+        Returns:
+            Dictionary mapping variable names to value Elements (first match wins)
+        """
+        configs = {}
+        for var_elem, val_elem in self._iter_config_pairs(parent):
+            configs.setdefault(var_elem.text, val_elem)
+        return configs
+
+    def _get_config_index(self, dev_name: str) -> Optional[Dict[str, Dict[str, ET.Element]]]:
+        """
+        Get the device and SDR config index for a device, building it on first use
+
+        Args:
+            dev_name: Device name
+
+        Returns:
+            Dictionary with 'DEV' and 'SDR' variable -> value Element maps, None if device not found
+        """
+        index = self._cfg_index.get(dev_name)
+        if index is not None:
+            return index
+
+        device = self.get_device_by_name(dev_name)
+        if device is None:
+            return None
+
+        sdr = device.find('sdr')
+        index = {
+            'DEV': self._index_configs(device),
+            'SDR': self._index_configs(sdr) if sdr is not None else {}
+        }
+        self._cfg_index[dev_name] = index
+        return index
 
     def get_device_config(self, dev_name: str) -> Dict[str, str]:
         """
@@ -79,23 +274,15 @@ class PMCDeviceConfig:
         if device is None:
             return {}
 
-        config = {}
-
-        # Get device-level configs
-        for config_elem in device.findall('config'):
-            variable = config_elem.find('variable')
-            value = config_elem.find('value')
-            if variable is not None and value is not None:
-                config[variable.text] = value.text
+        # Walk configs in document order (not the first-match index) so a
+        # duplicated variable keeps its last value
+        config = {variable.text: value.text for variable, value in self._iter_config_pairs(device)}
 
         # Get SDR configs
         sdr = device.find('sdr')
         if sdr is not None:
-            for config_elem in sdr.findall('config'):
-                variable = config_elem.find('variable')
-                value = config_elem.find('value')
-                if variable is not None and value is not None:
-                    config[f"SDR_{variable.text}"] = value.text
+            for variable, value in self._iter_config_pairs(sdr):
+                config[f"SDR_{variable.text}"] = value.text
 
         return config
 
@@ -117,22 +304,23 @@ class PMCDeviceConfig:
         if device is None:
             return None
 
-        # Get M_VAL and R_EXP from any config (device or SDR)
-        m_val_str, r_exp_str = self.get_mval_rexp_from_anywhere(dev_name)
-
-        if m_val_str is None or r_exp_str is None:
-            print(f"Error: Config conversion requires M_VAL and R_EXP but they are not found in device or SDR config for device '{dev_name}'")
-            return None
-
         try:
-            # Convert hex strings if needed
-            m_val = int(m_val_str, 16) if m_val_str.startswith(('0x', '0X')) else int(m_val_str)
-            r_exp = self._parse_4bit_signed_int(r_exp_str)
-            raw_val_str = raw_value.decode() if isinstance(raw_value, bytes) else str(raw_value)
-            raw_val = float(int(raw_val_str, 16) if raw_val_str.startswith(('0x', '0X')) else float(raw_val_str))
+            # M_VAL, R_EXP and 10^(R_EXP), parsed once per device
+            scale_info = self._get_scale(dev_name)
+            if scale_info is None:
+                print(f"Error: Config conversion requires M_VAL and R_EXP but they are not found in device or SDR config for device '{dev_name}'")
+                return None
+            m_val, r_exp, pow10, _ = scale_info
+
+            if isinstance(raw_value, (int, float)):
+                # Already parsed by the caller
+                raw_val = float(raw_value)
+            else:
+                raw_val_str = raw_value.decode() if isinstance(raw_value, bytes) else str(raw_value)
+                raw_val = _parse_float(raw_val_str)
 
             # Formula: real_value = (M_VAL * raw_value) * 10^(R_EXP)
-            real_value = (m_val * raw_val) * (10 ** r_exp)
+            real_value = (m_val * raw_val) * pow10
 
             if print_calculation:
                 print(f"Calculation: ({m_val} * {raw_val}) * 10^({r_exp}) = {real_value}")
@@ -160,22 +348,18 @@ class PMCDeviceConfig:
         if device is None:
             return None
 
-        # Get M_VAL and R_EXP from any config (device or SDR)
-        m_val_str, r_exp_str = self.get_mval_rexp_from_anywhere(dev_name)
-
-        if m_val_str is None or r_exp_str is None:
-            print(f"Error: Config conversion requires M_VAL and R_EXP but they are not found in device or SDR config for device '{dev_name}'")
-            return None
-
         try:
-            # Convert hex strings if needed
-            m_val = int(m_val_str, 16) if m_val_str.startswith(('0x', '0X')) else int(m_val_str)
-            r_exp = self._parse_4bit_signed_int(r_exp_str)
+            # M_VAL, R_EXP and M_VAL * 10^(R_EXP), parsed once per device
+            scale_info = self._get_scale(dev_name)
+            if scale_info is None:
+                print(f"Error: Config conversion requires M_VAL and R_EXP but they are not found in device or SDR config for device '{dev_name}'")
+                return None
+            m_val, r_exp, _, denominator = scale_info
+
             real_val_str = real_value.decode() if isinstance(real_value, bytes) else str(real_value)
             real_val = float(real_val_str)
 
             # Formula: raw_value = real_value / (M_VAL * 10^(R_EXP))
-            denominator = m_val * (10 ** r_exp)
             if denominator == 0:
                 print("Error: Cannot divide by zero (M_VAL is 0)")
                 return None
@@ -191,6 +375,25 @@ class PMCDeviceConfig:
             print(f"Error: Failed to convert real value - {e}")
             return None
 
+    def convert_raws_to_real(self, dev_name: str, raw_values: List[str]) -> List[Optional[float]]:
+        """
+        Convert a batch of raw values to real values using M_VAL and R_EXP from any config
+
+        M_VAL and R_EXP are resolved once for the whole batch.
+
+        Args:
+            dev_name: Device name
+            raw_values: Raw values to convert
+
+        Returns:
+            Real values in input order (None for values that could not be converted,
+            or for every value if the device has no M_VAL/R_EXP)
+        """
+        raw_to_real = self._raw_converter(dev_name)
+        if raw_to_real is None:
+            return [None] * len(raw_values)
+        return [raw_to_real(raw_value) for raw_value in raw_values]
+
     def _parse_4bit_signed_int(self, value_str: str) -> int:
         """
         Parses a string as a 4-bit signed integer (range -8 to 7).
@@ -198,8 +401,7 @@ class PMCDeviceConfig:
         """
         # First, parse the string to a standard integer.
         # It can be a negative decimal like "-3" or a hex like "0xf".
-        base = 16 if value_str.strip().startswith(('0x', '0X')) else 10
-        num = int(value_str, base)
+        num = _parse_int(value_str)
 
         # If the number is already negative (from decimal), it's likely correct.
         # If it's from hex, apply 4-bit two's complement logic.
@@ -222,28 +424,117 @@ class PMCDeviceConfig:
         Returns:
             Tuple of (M_VAL, R_EXP) or (None, None) if not found
         """
+        cached = self._mval_rexp_cache.get(dev_name)
+        if cached is not None:
+            return cached
+
         device = self.get_device_by_name(dev_name)
         if device is None:
             return None, None
 
-        # First try device config
+        # First try device config; the last occurrence of each variable wins.
+        # This scan runs once per device since the result is cached.
         m_val_device = None
         r_exp_device = None
-
-        for config_elem in device.findall('config'):
-            var_elem = config_elem.find('variable')
-            val_elem = config_elem.find('value')
-            if var_elem is not None and val_elem is not None:
-                if var_elem.text == 'M_VAL':
-                    m_val_device = val_elem.text
-                elif var_elem.text == 'R_EXP':
-                    r_exp_device = val_elem.text
+        for var_elem, val_elem in self._iter_config_pairs(device):
+            if var_elem.text == 'M_VAL':
+                m_val_device = val_elem.text
+            elif var_elem.text == 'R_EXP':
+                r_exp_device = val_elem.text
 
         if m_val_device is not None and r_exp_device is not None:
-            return m_val_device, r_exp_device
+            result = (m_val_device, r_exp_device)
+        else:
+            # If not found in device config, try SDR config
+            result = (self.get_sdr_config_value(dev_name, 'M_VAL'), self.get_sdr_config_value(dev_name, 'R_EXP'))
+
+        self._mval_rexp_cache[dev_name] = result
+        return result
+
+    def has_conversion(self, dev_name: str) -> bool:
+        """
+        Check whether a device has the M_VAL and R_EXP needed for raw/real conversion
+
+        Args:
+            dev_name: Device name
+
+        Returns:
+            True if both M_VAL and R_EXP are found in device or SDR config
+        """
+        m_val_str, r_exp_str = self.get_mval_rexp_from_anywhere(dev_name)
+        return m_val_str is not None and r_exp_str is not None
+
+    def _get_scale(self, dev_name: str) -> Optional[Tuple[int, int, float, float]]:
+        """
+        Get parsed M_VAL, R_EXP, 10^(R_EXP) and the combined scale M_VAL * 10^(R_EXP)
+
+        Raw -> real conversion must multiply as (M_VAL * raw) * 10^(R_EXP) to give
+        the same floats as the documented formula; the combined scale is only
+        used as the real -> raw divisor.
+
+        Args:
+            dev_name: Device name
+
+        Returns:
+            Tuple of (M_VAL, R_EXP, 10^(R_EXP), scale) or None if M_VAL or R_EXP is missing
+
+        Raises:
+            ValueError: If M_VAL or R_EXP cannot be parsed
+        """
+        cached = self._parsed_scale.get(dev_name)
+        if cached is not None:
+            return cached
+
+        m_val_str, r_exp_str = self.get_mval_rexp_from_anywhere(dev_name)
+        if m_val_str is None or r_exp_str is None:
+            return None
+
+        # Convert hex strings if needed
+        m_val = _parse_int(m_val_str)
+        r_exp = self._parse_4bit_signed_int(r_exp_str)
+        pow10 = _pow10(r_exp)
+        result = (m_val, r_exp, pow10, m_val * pow10)
 
-        # If not found in device config, try SDR config
-        return self.get_sdr_config_value(dev_name, 'M_VAL'), self.get_sdr_config_value(dev_name, 'R_EXP')
+        self._parsed_scale[dev_name] = result
+        return result
+
+    def _raw_converter(self, dev_name: str) -> Optional[Callable[[str], Optional[float]]]:
+        """
+        Build a raw -> real converter with the device scale resolved up front
+
+        Intended for loops over many values of one device, where calling
+        convert_raw_to_real would look up and parse M_VAL/R_EXP every time.
+
+        Args:
+            dev_name: Device name
+
+        Returns:
+            Function converting a raw value string to its real value, None if the
+            device has no usable M_VAL/R_EXP
+        """
+        try:
+            scale_info = self._get_scale(dev_name)
+        except (ValueError, TypeError, OverflowError) as e:
+            print(f"Error: Failed to convert raw value - {e}")
+            return None
+        if scale_info is None:
+            return None
+        m_val, _, pow10, _ = scale_info
+
+        def raw_to_real(raw_value: str) -> Optional[float]:
+            try:
+                return (m_val * _parse_float(str(raw_value))) * pow10
+            except (ValueError, TypeError, OverflowError) as e:
+                print(f"Error: Failed to convert raw value - {e}")
+                return None
+
+        return raw_to_real
+
+    def _invalidate_scale(self, dev_name: str, variable: str):
+        """Drop cached M_VAL/R_EXP for a device if the variable being set affects them"""
+        if variable in ('M_VAL', 'R_EXP', 'SDR_M_VAL', 'SDR_R_EXP'):
+            self._mval_rexp_cache.pop(dev_name, None)
+            self._parsed_scale.pop(dev_name, None)
 
     def get_config_value(self, dev_name: str, variable: str) -> Optional[str]:
         """
@@ -256,41 +547,21 @@ class PMCDeviceConfig:
         Returns:
             Value if found, None otherwise
         """
-        device = self.get_device_by_name(dev_name)
-        if device is None:
+        index = self._get_config_index(dev_name)
+        if index is None:
             return None
 
         # Check if it's an SDR config (starts with SDR_)
         if variable.startswith('SDR_'):
-            sdr_var = variable[4:]  # Remove SDR_ prefix
-            sdr = device.find('sdr')
-            if sdr is not None:
-                for config_elem in sdr.findall('config'):
-                    var_elem = config_elem.find('variable')
-                    val_elem = config_elem.find('value')
-                    if var_elem is not None and var_elem.text == sdr_var:
-                        # Return value as-is without formatting to preserve original format
-                        return val_elem.text if val_elem is not None else None
+            val_elem = index['SDR'].get(variable[4:])  # Remove SDR_ prefix
         else:
-            # Regular device config - search device config first
-            for config_elem in device.findall('config'):
-                var_elem = config_elem.find('variable')
-                val_elem = config_elem.find('value')
-                if var_elem is not None and var_elem.text == variable:
-                    # Return value as-is without formatting to preserve original format
-                    return val_elem.text if val_elem is not None else None
+            # Regular device config - search device config first, then SDR config
+            val_elem = index['DEV'].get(variable)
+            if val_elem is None:
+                val_elem = index['SDR'].get(variable)
 
-            # If not found in device config, search SDR config
-            sdr = device.find('sdr')
-            if sdr is not None:
-                for config_elem in sdr.findall('config'):
-                    var_elem = config_elem.find('variable')
-                    val_elem = config_elem.find('value')
-                    if var_elem is not None and var_elem.text == variable:
-                        # Return value as-is without formatting to preserve original format
-                        return val_elem.text if val_elem is not None else None
-
-        return None
+        # Return value as-is without formatting to preserve original format
+        return val_elem.text if val_elem is not None else None
 
     def get_sdr_config_value(self, dev_name: str, variable: str) -> Optional[str]:
         """
@@ -303,21 +574,12 @@ class PMCDeviceConfig:
         Returns:
             Value if found, None otherwise
         """
-        device = self.get_device_by_name(dev_name)
-        if device is None:
+        index = self._get_config_index(dev_name)
+        if index is None:
             return None
 
-        sdr = device.find('sdr')
-        if sdr is None:
-            return None
-
-        for config_elem in sdr.findall('config'):
-            var_elem = config_elem.find('variable')
-            val_elem = config_elem.find('value')
-            if var_elem is not None and var_elem.text == variable:
-                return val_elem.text if val_elem is not None else None
-
-        return None
+        val_elem = index['SDR'].get(variable)
+        return val_elem.text if val_elem is not None else None
 
     def set_config_value(self, dev_name: str, variable: str, new_value: str) -> bool:
         """
@@ -331,65 +593,58 @@ class PMCDeviceConfig:
         Returns:
             True if successful, False otherwise
         """
-        device = self.get_device_by_name(dev_name)
-        if device is None:
+        index = self._get_config_index(dev_name)
+        if index is None:
             print(f"Error: Device '{dev_name}' not found")
             return False
 
+        self._invalidate_scale(dev_name, variable)
+
         # Check if it's an SDR config (starts with SDR_)
         if variable.startswith('SDR_'):
             sdr_var = variable[4:]  # Remove SDR_ prefix
-            sdr = device.find('sdr')
-            if sdr is None:
-                print(f"Error: Device '{dev_name}' has no SDR section")
-                return False
 
             # Find existing SDR config
-            for config_elem in sdr.findall('config'):
-                var_elem = config_elem.find('variable')
-                val_elem = config_elem.find('value')
-                if var_elem is not None and var_elem.text == sdr_var:
-                    if val_elem is not None:
-                        val_elem.text = new_value
-                        print(f"Updated SDR config {sdr_var} to {new_value}")
-                        return True
-
-            print(f"Error: SDR config '{sdr_var}' not found in device '{dev_name}'")
+            val_elem = index['SDR'].get(sdr_var)
+            if val_elem is not None:
+                val_elem.text = new_value
+                print(f"Updated SDR config {sdr_var} to {new_value}")
+                return True
+
+            if self.get_device_by_name(dev_name).find('sdr') is None:
+                print(f"Error: Device '{dev_name}' has no SDR section")
+            else:
+                print(f"Error: SDR config '{sdr_var}' not found in device '{dev_name}'")
             return False
 
         else:
             # Regular device config - search device config first
-            for config_elem in device.findall('config'):
-                var_elem = config_elem.find('variable')
-                val_elem = config_elem.find('value')
-                if var_elem is not None and var_elem.text == variable:
-                    if val_elem is not None:
-                        val_elem.text = new_value
-                        print(f"Updated {variable} to {new_value}")
-                        return True
+            val_elem = index['DEV'].get(variable)
+            if val_elem is not None:
+                val_elem.text = new_value
+                print(f"Updated {variable} to {new_value}")
+                return True
 
             # If not found in device config, search SDR config
-            sdr = device.find('sdr')
-            if sdr is not None:
-                for config_elem in sdr.findall('config'):
-                    var_elem = config_elem.find('variable')
-                    val_elem = config_elem.find('value')
-                    if var_elem is not None and var_elem.text == variable:
-                        if val_elem is not None:
-                            val_elem.text = new_value
-                            print(f"Updated SDR config {var_elem.text} to {new_value}")
-                            return True
+            val_elem = index['SDR'].get(variable)
+            if val_elem is not None:
+                val_elem.text = new_value
+                print(f"Updated SDR config {variable} to {new_value}")
+                return True
 
             # If config doesn't exist, create new one in device config
-            config = ET.SubElement(device, 'config')
+            # Build the <config> subtree detached, then link it to the device once
+            config = ET.Element('config')
             var_elem = ET.SubElement(config, 'variable')
             var_elem.text = variable
             val_elem = ET.SubElement(config, 'value')
             val_elem.text = new_value
+            self.get_device_by_name(dev_name).append(config)
+            index['DEV'][variable] = val_elem
             print(f"Added new config {variable} = {new_value}")
             return True
 
-    def interactive_set_thresholds(self, dev_name: str, threshold_params: set) -> Dict[str, str]:
+    def interactive_set_thresholds(self, dev_name: str, threshold_params: frozenset = _THRESHOLD_PARAMS) -> Dict[str, str]:
         """
         Interactive mode to set all threshold parameters
 
@@ -420,59 +675,41 @@ class PMCDeviceConfig:
             print(f"Error: Device '{dev_name}' has no SDR section")
             return changes
 
+        # Resolve M_VAL/R_EXP once for every conversion below
+        raw_to_real = self._raw_converter(dev_name)
+        scale = self._get_scale(dev_name)[3] if raw_to_real is not None else None
+
         # First, display current values with real values aligned
         print("\nCurrent threshold values:")
         print("-" * 40)
 
         current_values = {}
-        for config_elem in sdr.findall('config'):
-            variable = config_elem.find('variable')
-            value = config_elem.find('value')
-            if variable is not None and value is not None:
-                var_name = variable.text
-                val_str = value.text
-
-                if var_name in threshold_params:
-                    current_values[var_name] = val_str
-                    # Display current value with real value if possible
-                    base_str = f"  {var_name}: {val_str}"
-                    real_val = None
-                    if self.get_mval_rexp_from_anywhere(dev_name)[0] is not None:
-                        real_val = self.convert_raw_to_real(dev_name, val_str, print_calculation=False)
+        for variable, value in self._iter_config_pairs(sdr):
+            var_name = variable.text
+            val_str = value.text
 
-                    if real_val is not None:
-                        padding = max(1, 32 - len(base_str))
-                        print(f"{base_str}{' '*padding}({real_val})")
-                    else:
-                        print(base_str)
+            if var_name in threshold_params:
+                current_values[var_name] = val_str
+                # Display current value with real value if possible
+                base_str = f"  {var_name}: {val_str}"
+                real_val = raw_to_real(val_str) if raw_to_real is not None else None
+
+                if real_val is not None:
+                    print(f"{base_str.ljust(31)} ({real_val})")
+                else:
+                    print(base_str)
 
         print("\n" + "-" * 60)
         print("Enter new values (or press Enter to skip):")
         print("-" * 60)
 
         # Process each threshold parameter in specific order
-        # Order: lower thresholds first, then upper thresholds, then nominal
-        ordered_params = [
-            'LOWER_NON_RECOVERABLE',
-            'LOWER_CRITICAL',
-            'LOWER_NON_CRITICAL',
-            'UPPER_NON_CRITICAL',
-            'UPPER_CRITICAL',
-            'UPPER_NON_RECOVERABLE',
-            'SEN_MIN',
-            'SEN_MAX',
-            'NOMINAL_MIN',
-            'NOMINAL_MAX'
-        ]
-
-        for param in ordered_params:
+        for param in _ORDERED_PARAMS:
             if param not in current_values:
                 continue
 
             current_val = current_values[param]
-            current_real = None
-            if self.get_mval_rexp_from_anywhere(dev_name)[0] is not None:
-                current_real = self.convert_raw_to_real(dev_name, current_val, print_calculation=False)
+            current_real = raw_to_real(current_val) if raw_to_real is not None else None
 
             # Prompt user
             if current_real is not None:
@@ -489,10 +726,17 @@ class PMCDeviceConfig:
             # Convert and set the new value
             try:
                 if current_real is not None:
-                    # Convert from real value to raw
-                    raw_val = self.convert_real_to_raw(dev_name, user_input, print_calculation=False)
+                    # Convert from real value to raw: raw_value = real_value / (M_VAL * 10^(R_EXP))
+                    raw_val = None
+                    if scale == 0:
+                        print("Error: Cannot divide by zero (M_VAL is 0)")
+                    else:
+                        try:
+                            raw_val = round(float(user_input) / scale)
+                        except (ValueError, OverflowError) as e:
+                            print(f"Error: Failed to convert real value - {e}")
                     if raw_val is not None:
-                        new_value = f"0x{raw_val:x}"
+                        new_value = _to_hex(raw_val)
                         print(f"  -> Converting {user_input} to {new_value}")
                         changes[param] = new_value
                     else:
@@ -508,17 +752,12 @@ class PMCDeviceConfig:
         print("Now configuring mask values (or press Enter to skip):")
         print("-" * 60)
 
-        mask_params = ['LWR_T_MASK', 'UPR_T_MASK', 'S_R_T_MASK']
-        for mask_param in mask_params:
+        for mask_param in _MASK_PARAMS:
             current_mask = self.get_sdr_config_value(dev_name, mask_param)
             if current_mask is None:
                 current_mask = "Not set"
 
-            mask_prompt = f"{mask_param} (Lower Threshold Reading Mask) [current: {current_mask}]: "
-            if mask_param == 'UPR_T_MASK':
-                mask_prompt = f"{mask_param} (Upper Threshold Reading Mask) [current: {current_mask}]: "
-            elif mask_param == 'S_R_T_MASK':
-                mask_prompt = f"{mask_param} (Settable/Readable Threshold Mask) [current: {current_mask}]: "
+            mask_prompt = f"{mask_param} ({_MASK_DESCRIPTIONS[mask_param]}) [current: {current_mask}]: "
 
             mask_input = input(mask_prompt).strip()
 
@@ -581,16 +820,9 @@ class PMCDeviceConfig:
         print("Press Enter to skip a mask parameter.")
         print("-" * 60)
 
-        mask_params = ['LWR_T_MASK', 'UPR_T_MASK', 'S_R_T_MASK']
-        mask_descriptions = {
-            'LWR_T_MASK': 'Lower Threshold Reading Mask',
-            'UPR_T_MASK': 'Upper Threshold Reading Mask',
-            'S_R_T_MASK': 'Settable/Readable Threshold Mask'
-        }
-
         mask_values = {}
-        for mask_param in mask_params:
-            prompt = f"{mask_param} ({mask_descriptions[mask_param]}): "
+        for mask_param in _MASK_PARAMS:
+            prompt = f"{mask_param} ({_MASK_DESCRIPTIONS[mask_param]}): "
             user_input = input(prompt).strip()
             if user_input:
                 mask_values[mask_param] = user_input
@@ -610,33 +842,56 @@ class PMCDeviceConfig:
         """
         Save changes back to the PMC file
 
+        The new content is written to a temporary file which then replaces the
+        original, so the PMC file is never left missing or half-written.
+
         Args:
             backup: Create a backup of the original file
         """
-        if backup:
-            backup_file = f"{self.pmc_file}.backup"
-            os.replace(self.pmc_file, backup_file)
-            print(f"Backup created: {backup_file}")
+        if self.read_only:
+            print("Error: Cannot save a PMC file opened in read-only mode")
+            return False
 
+        tmp_file = f"{self.pmc_file}.tmp"
         try:
             # Write to a memory buffer first to control the output
             buffer = io.BytesIO()
             # Use a specific encoding, but we will handle the header manually
-            self.tree.write(buffer, encoding='iso-8859-1', xml_declaration=True, short_empty_elements=False)
+            if _HAS_LXML:
+                # lxml has no short_empty_elements; empty text keeps the <tag></tag> form.
+                # The text is reset afterwards so lookups still see None, as on the stdlib backend.
+                empty_elems = [elem for elem in self.root.iter()
+                               if isinstance(elem.tag, str) and elem.text is None and len(elem) == 0]
+                for elem in empty_elems:
+                    elem.text = ''
+                try:
+                    self.tree.write(buffer, encoding='iso-8859-1', xml_declaration=True, pretty_print=False)
+                finally:
+                    for elem in empty_elems:
+                        elem.text = None
+            else:
+                self.tree.write(buffer, encoding='iso-8859-1', xml_declaration=True, short_empty_elements=False)
             xml_content_bytes = buffer.getvalue()
 
-            # Decode and split into lines
-            xml_content_lines = xml_content_bytes.decode('iso-8859-1').splitlines(True)
-
-            with open(self.pmc_file, 'w', encoding='iso-8859-1') as f:
+            with open(tmp_file, 'w', encoding='iso-8859-1') as f:
                 # Write the original header lines
                 f.writelines(self.xml_header_lines)
                 # Write the rest of the XML, skipping the declaration generated by tree.write
-                f.writelines(xml_content_lines[1:])
+                f.write(xml_content_bytes.decode('iso-8859-1').partition('\n')[2])
+            shutil.copymode(self.pmc_file, tmp_file)
+
+            if backup:
+                backup_file = f"{self.pmc_file}.backup"
+                # Copy rather than move, so the PMC file stays in place until the replace below
+                shutil.copy2(self.pmc_file, backup_file)
+                print(f"Backup created: {backup_file}")
+            os.replace(tmp_file, self.pmc_file)
 
             print(f"Changes saved to: {self.pmc_file}")
         except Exception as e:
             print(f"Error saving file: {e}")
+            if os.path.exists(tmp_file):
+                os.remove(tmp_file)
             return False
         return True
 
@@ -647,20 +902,35 @@ class PMCDeviceConfig:
         Returns:
             List of dictionaries containing device information
         """
-        devices = []
-        for device in self.root.findall('.//device'):
-            dev_name_elem = device.find('dev_name')
-            dev_class_elem = device.find('dev_class')
-            name_elem = device.find('name')
+        if self._device_summaries is not None:
+            return list(self._device_summaries)
+
+        return [self._device_summary(device) for device in self._iter_devices()]
+
+    def _device_summary(self, device: ET.Element) -> Dict[str, str]:
+        """
+        Collect the name, class and dev_name of a device
+
+        Args:
+            device: Device element
 
-            dev_info = {
-                'name': name_elem.text if name_elem is not None else 'N/A',
-                'dev_class': dev_class_elem.text if dev_class_elem is not None else 'N/A',
-                'dev_name': dev_name_elem.text if dev_name_elem is not None else 'N/A'
-            }
-            devices.append(dev_info)
+        Returns:
+            Dictionary containing device information ('N/A' for missing fields)
+        """
+        # Single pass over the children; these tags normally come first, so stop once all are seen
+        found = {}
+        for child in device:
+            tag = child.tag
+            if tag in ('name', 'dev_class', 'dev_name') and tag not in found:
+                found[tag] = child.text
+                if len(found) == 3:
+                    break
 
-        return devices
+        return {
+            'name': found.get('name', 'N/A'),
+            'dev_class': found.get('dev_class', 'N/A'),
+            'dev_name': found.get('dev_name', 'N/A')
+        }
 
     def print_device_info(self, dev_name: str):
         """Print all information about a device"""
@@ -712,54 +982,34 @@ class PMCDeviceConfig:
         # Device Configurations
         print("Configurations:")
         print("-" * 30)
-        for config_elem in device.findall('config'):
-            variable = config_elem.find('variable')
-            value = config_elem.find('value')
-            if variable is not None and value is not None:
-                print(f"  {variable.text}: {value.text}")
+        for variable, value in self._iter_config_pairs(device):
+            print(f"  {variable.text}: {value.text}")
 
         # SDR Configurations
         if sdr is not None:
             print("\nSDR:")
             print("-" * 30)
 
-            # Threshold parameters that need Real value conversion
-            threshold_vars = {
-                'NOMINAL_READING', 'NOMINAL_MAX', 'NOMINAL_MIN',
-                'SEN_MAX', 'SEN_MIN',
-                'UPPER_NON_RECOVERABLE', 'UPPER_CRITICAL', 'UPPER_NON_CRITICAL',
-                'LOWER_NON_RECOVERABLE', 'LOWER_CRITICAL', 'LOWER_NON_CRITICAL'
-            }
-
-            # First pass: collect all configs and calculate max length for alignment
-            configs = []
-            max_val_len = 0
-
-            for config_elem in sdr.findall('config'):
-                variable = config_elem.find('variable')
-                value = config_elem.find('value')
-                if variable is not None and value is not None:
-                    var_name = variable.text
-                    val_str = value.text
-                    # Calculate max length for value alignment
-                    max_val_len = max(max_val_len, len(val_str))
-                    configs.append((var_name, val_str))
+            # First pass: collect all configs
+            configs = [(variable.text, value.text) for variable, value in self._iter_config_pairs(sdr)]
 
-            # Second pass: print with aligned real values
-            m_val_str, r_exp_str = self.get_mval_rexp_from_anywhere(dev_name)
-            has_conversion = (m_val_str is not None and r_exp_str is not None)
+            # Convert all threshold parameters to Real values in one batch
+            real_by_row = {}
+            if self.has_conversion(dev_name):
+                threshold_rows = [i for i, (var_name, _) in enumerate(configs) if var_name in _THRESHOLD_PARAMS]
+                real_values = self.convert_raws_to_real(dev_name, [configs[i][1] for i in threshold_rows])
+                real_by_row = dict(zip(threshold_rows, real_values))
 
-            for var_name, val_str in configs:
+            # Second pass: print with aligned real values
+            for row, (var_name, val_str) in enumerate(configs):
                 # Check if this is a threshold parameter that needs Real value
-                if var_name in threshold_vars and has_conversion:
-                    # Convert to real value
-                    real_val = self.convert_raw_to_real(dev_name, val_str, print_calculation=False)
+                if row in real_by_row:
+                    real_val = real_by_row[row]
                     if real_val is not None:
                         # Build base string (variable name and value)
                         base_str = f"  {var_name}: {val_str}"
-                        # Calculate padding to align real values at position 32 (0-indexed)
-                        padding = max(1, 32 - len(base_str))
-                        print(f"{base_str}{' ' * padding}({real_val})")
+                        # Align real values at position 32 (0-indexed), with at least one space
+                        print(f"{base_str.ljust(31)} ({real_val})")
                     else:
                         print(f"  {var_name}: {val_str}")
                 else:
@@ -770,14 +1020,6 @@ class PMCDeviceConfig:
 def main():
     import argparse
 
-    # Threshold parameters that need automatic Real/Raw conversion
-    THRESHOLD_PARAMS = {
-        'NOMINAL_READING', 'NOMINAL_MAX', 'NOMINAL_MIN',
-        'SEN_MAX', 'SEN_MIN',
-        'UPPER_NON_RECOVERABLE', 'UPPER_CRITICAL', 'UPPER_NON_CRITICAL',
-        'LOWER_NON_RECOVERABLE', 'LOWER_CRITICAL', 'LOWER_NON_CRITICAL'
-    }
-
     parser = argparse.ArgumentParser(description='Parse and modify PMC device configurations')
     parser.add_argument('pmc_file', help='Path to the PMC file')
     parser.add_argument('--dev', help='Device name to operate on (using <name> tag)')
@@ -793,7 +1035,13 @@ def main():
 
     args = parser.parse_args()
 
-    manager = PMCDeviceConfig(args.pmc_file)
+    # Validate arguments before paying for the file parse
+    if not (args.list or args.set_mask or args.dev):
+        parser.error("--dev is required (unless using --list or --set-mask)")
+
+    # Commands that never save can stream the file and keep only the device they need
+    read_only = args.list or (args.get is not None and not (args.set or args.set_thres or args.set_mask))
+    manager = PMCDeviceConfig(args.pmc_file, read_only=read_only, keep_device=None if args.list else args.dev)
 
     if args.list:
         devices = manager.list_all_devices()
@@ -841,23 +1089,22 @@ def main():
             print("\nNo changes to apply.")
         return
 
-    if not args.dev:
-        parser.error("--dev is required (unless using --list or --set-mask)")
-
     if args.get:
         variable = args.get
         value = manager.get_config_value(args.dev, variable)
         if value is not None:
             # Check if this is a threshold parameter that needs automatic conversion
-            if variable in THRESHOLD_PARAMS:
-                real_val = manager.convert_raw_to_real(args.dev, value, print_calculation=True)
+            if variable in _THRESHOLD_PARAMS:
+                # Parse the raw value once and reuse it for conversion and hex display
+                try:
+                    raw_int = _parse_int(value)
+                except ValueError:
+                    raw_int = None
+
+                real_val = manager.convert_raw_to_real(args.dev, value if raw_int is None else raw_int, print_calculation=True)
                 if real_val is not None:
                     # Format raw value as hex (0x) format
-                    try:
-                        raw_int = int(value, 16) if value.startswith(('0x', '0X')) else int(value)
-                        raw_hex = f"0x{raw_int:x}"
-                    except ValueError:
-                        raw_hex = value
+                    raw_hex = value if raw_int is None else _to_hex(raw_int)
 
                     print(f"{variable}:")
                     print(f"  raw = {raw_hex}")
@@ -875,11 +1122,11 @@ def main():
         # For threshold parameters, convert real value to raw automatically
         converted_value = value
         converted_msg = ""
-        if variable in THRESHOLD_PARAMS:
+        if variable in _THRESHOLD_PARAMS:
             raw_val = manager.convert_real_to_raw(args.dev, value, print_calculation=True)
             if raw_val is not None:
                 # Format as hex (0x) format
-                converted_value = f"0x{raw_val:x}"
+                converted_value = _to_hex(raw_val)
                 converted_msg = f" (converted from real value {value})"
             else:
                 print(f"Error: Failed to convert real value. Aborting.")
@@ -892,7 +1139,7 @@ def main():
             manager.save_file(backup=not args.no_backup)
     elif args.set_thres:
         # Interactive threshold configuration
-        changes = manager.interactive_set_thresholds(args.dev, THRESHOLD_PARAMS)
+        changes = manager.interactive_set_thresholds(args.dev, _THRESHOLD_PARAMS)
 
         if changes:
             print(f"\n{'='*60}")